@@ -6,9 +6,15 @@ This script removes duplicate signal definitions that cause parsing errors
 
 import sys
 import os
-import re
+import io
+import shutil
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Large I/O buffer so multi-MB DBCs are read and written in a few syscalls
+_IO_BUFFER = 1 << 20
+
 def fix_dbc_file(filepath):
     """Remove overlapping signal definitions from DBC file"""
     print(f"Processing: {filepath}")
@@ -21,55 +27,61 @@ def fix_dbc_file(filepath):
     backup_path = filepath + '.backup'
     if not os.path.exists(backup_path):
         print(f"Creating backup: {backup_path}")
-        with open(filepath, 'r') as f:
-            content = f.read()
-        with open(backup_path, 'w') as f:
-            f.write(content)
-    
-    # Read the file
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
+        shutil.copyfile(filepath, backup_path)
     
-    # Track seen signals per message
+    # Stream the file through a temp copy instead of holding every line
+    tmp_path = filepath + '.tmp'
     current_message = None
-    seen_signals = {}
-    fixed_lines = []
+    current_signals = set()
     removed_count = 0
     
-    for line in lines:
-        # Check if this is a message definition
-        msg_match = re.match(r'BO_ (\d+) (\w+):', line)
-        if msg_match:
-            current_message = msg_match.group(2)
-            seen_signals[current_message] = set()
-            fixed_lines.append(line)
-            continue
-        
-        # Check if this is a signal definition
-        sig_match = re.match(r'\s+SG_ (\w+)', line)
-        if sig_match and current_message:
-            signal_name = sig_match.group(1)
+    with open(filepath, 'r', buffering=_IO_BUFFER) as fin, \
+         open(tmp_path, 'w', buffering=_IO_BUFFER) as fout:
+        out_write = fout.write
+        for line in fin:
+            # Check if this is a message definition
+            if line.startswith('BO_ '):
+                parts = line.split(None, 3)
+                if len(parts) >= 3:
+                    current_message = parts[2].split(':', 1)[0]
+                    # Signals are only compared within one message block
+                    current_signals = set()
+                    out_write(line)
+                    continue
             
-            # Check for duplicate signal in this message
-            if signal_name in seen_signals[current_message]:
-                print(f"  Removing duplicate signal: {signal_name} in message {current_message}")
-                removed_count += 1
-                continue
-            else:
-                seen_signals[current_message].add(signal_name)
-        
-        fixed_lines.append(line)
+            # Check if this is a signal definition
+            fields = line.split(None, 2) if line[:1] in (' ', '\t') else ()
+            if len(fields) >= 2 and fields[0] == 'SG_' and current_message:
+                signal_name = fields[1].split(':', 1)[0]
+                
+                # Check for duplicate signal in this message
+                if signal_name in current_signals:
+                    print(f"  Removing duplicate signal: {signal_name} in message {current_message}")
+                    removed_count += 1
+                    continue
+                else:
+                    current_signals.add(signal_name)
+            
+            out_write(line)
     
     if removed_count > 0:
-        # Write fixed file
-        with open(filepath, 'w') as f:
-            f.writelines(fixed_lines)
+        # Swap the fixed file into place
+        shutil.copymode(filepath, tmp_path)
+        os.replace(tmp_path, filepath)
         print(f"✓ Fixed {removed_count} overlapping signals in {filepath}")
         return True
     else:
+        os.unlink(tmp_path)
         print(f"✓ No overlapping signals found in {filepath}")
         return True
 
+def _fix_dbc_file_buffered(filepath):
+    """Run fix_dbc_file in a worker, returning its result and captured output"""
+    out = io.StringIO()
+    with redirect_stdout(out):
+        result = fix_dbc_file(filepath)
+    return result, out.getvalue()
+
 def main():
     print("=" * 60)
     print("Toyota DBC File Fixer")
@@ -95,11 +107,16 @@ def main():
     
     print(f"Found {len(dbc_files)} DBC files to check:\n")
     
+    # Each file is independent, so fix them across cores. Workers buffer
+    # their output and map() yields in order, so each file's report prints
+    # as one block, in the same order as before.
     success = True
-    for dbc_file in dbc_files:
-        if not fix_dbc_file(str(dbc_file)):
-            success = False
-        print()
+    with ProcessPoolExecutor(max_workers=min(len(dbc_files), os.cpu_count() or 1)) as pool:
+        for result, output in pool.map(_fix_dbc_file_buffered, map(str, dbc_files)):
+            sys.stdout.write(output)
+            if not result:
+                success = False
+            print()
     
     if success:
         print("=" * 60)
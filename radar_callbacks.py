@@ -4,8 +4,10 @@ Example script showing how to consume Toyota radar tracks via callbacks.
 """
 
 import argparse
+import sys
 import time
-from typing import Dict
+from collections import OrderedDict, deque
+from typing import Deque, Dict
 
 from toyota_radar_driver import RadarTrack, ToyotaRadarConfig, ToyotaRadarDriver
 
@@ -64,6 +66,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Disable internal keep-alive loop.",
     )
+    parser.add_argument(
+        "--periodic-keepalive",
+        action="store_true",
+        help="Send constant keep-alive frames via python-can send_periodic (kernel BCM on SocketCAN).",
+    )
     parser.add_argument(
         "--keepalive-rate-hz",
         type=float,
@@ -98,20 +105,41 @@ def parse_args() -> argparse.Namespace:
 
 
 class TrackLogger:
-    def __init__(self, min_interval: float) -> None:
-        self._last_print: Dict[int, float] = {}
+    """Throttle track callbacks and queue them for printing off the CAN thread."""
+
+    def __init__(self, min_interval: float, max_tracks: int = 256, max_pending: int = 1024) -> None:
+        self._last_print: "OrderedDict[int, float]" = OrderedDict()
+        self._pending: Deque[RadarTrack] = deque(maxlen=max(max_pending, 1))
         self._min_interval = max(min_interval, 0.0)
+        self._max_tracks = max(max_tracks, 1)
+        self._get_last = self._last_print.get
+        self._set_last = self._last_print.__setitem__
 
     def __call__(self, track: RadarTrack) -> None:
-        now = time.time()
-        last = self._last_print.get(track.track_id, 0.0)
-        if now - last >= self._min_interval:
-            self._last_print[track.track_id] = now
-            print(
-                f"{time.strftime('%H:%M:%S')} track 0x{track.track_id:02X} "
+        now = time.monotonic()
+        last = self._get_last(track.track_id)
+        if last is None or now - last >= self._min_interval:
+            self._set_last(track.track_id, now)
+            self._last_print.move_to_end(track.track_id)
+            if len(self._last_print) > self._max_tracks:
+                self._last_print.popitem(last=False)
+            # Runs on the python-can notifier thread; keep stdio off this path
+            self._pending.append(track)
+
+    def flush(self) -> None:
+        """Print queued tracks in one write. Call from the main thread."""
+        pending = self._pending
+        lines = []
+        while pending:
+            track = pending.popleft()
+            lines.append(
+                f"{time.strftime('%H:%M:%S', time.localtime(track.timestamp))} track 0x{track.track_id:02X} "
                 f"long={track.long_dist:5.2f}m lat={track.lat_dist:5.2f}m "
-                f"rel_speed={track.rel_speed:5.2f}m/s new={track.new_track}"
+                f"rel_speed={track.rel_speed:5.2f}m/s new={track.new_track}\n"
             )
+        if lines:
+            sys.stdout.write("".join(lines))
+            sys.stdout.flush()
 
 
 def main() -> None:
@@ -133,10 +161,12 @@ def main() -> None:
         use_sudo=args.use_sudo,
         setup_extra_args=args.setup_extra,
         keepalive_enabled=not args.no_keepalive,
+        keepalive_periodic=args.periodic_keepalive,
     )
 
     driver = ToyotaRadarDriver(config)
-    driver.register_track_callback(TrackLogger(args.print_interval))
+    track_logger = TrackLogger(args.print_interval)
+    driver.register_track_callback(track_logger)
 
     try:
         driver.start()
@@ -147,11 +177,19 @@ def main() -> None:
     print("Toyota radar driver started. Waiting for track callbacks (Ctrl+C to exit).")
 
     try:
-        next_summary = time.time() + args.summary_interval
+        tracks: Dict[int, RadarTrack] = {}
+        tracks_version = None
+        next_summary = time.monotonic() + args.summary_interval
         while True:
             time.sleep(0.1)
-            if time.time() >= next_summary:
-                tracks = driver.get_tracks()
+            track_logger.flush()
+            now = time.monotonic()
+            if now >= next_summary:
+                version = driver.tracks_version()
+                cutoff = time.time() - config.track_timeout
+                if version != tracks_version or any(t.timestamp < cutoff for t in tracks.values()):
+                    tracks_version = version
+                    tracks = driver.get_tracks()
                 count = len(tracks)
                 status = driver.keepalive_status()
                 parts = [f"Tracks cached: {count}", f"RX messages: {driver.message_count()}"]
@@ -160,11 +198,15 @@ def main() -> None:
                     if status["last_error"]:
                         parts.append(f"ERR: {status['last_error']}")
                 print(" | ".join(parts))
-                next_summary = time.time() + args.summary_interval
+                # Advance on a fixed schedule so summaries do not drift
+                next_summary += args.summary_interval
+                if next_summary <= now:
+                    next_summary = now + args.summary_interval
     except KeyboardInterrupt:
         print("\nStopping driver...")
     finally:
         driver.stop()
+        track_logger.flush()
 
 
 if __name__ == "__main__":
@@ -5,8 +5,10 @@ Terminal visualization for Toyota radar tracks using the reusable radar driver.
 
 import argparse
 import curses
+import heapq
 import time
-from typing import Dict
+from operator import attrgetter
+from typing import Dict, Optional
 
 from toyota_radar_driver import (
     RadarTrack,
@@ -87,6 +89,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Disable internal keep-alive loop (another node must provide it).",
     )
+    parser.add_argument(
+        "--periodic-keepalive",
+        action="store_true",
+        help="Send constant keep-alive frames via python-can send_periodic (kernel BCM on SocketCAN).",
+    )
     parser.add_argument(
         "--max-long",
         type=float,
@@ -108,8 +115,20 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def clamp(value: float, lower: float, upper: float) -> float:
-    return max(lower, min(upper, value))
+_HBARS: Dict[int, str] = {}
+_PANEL_HEADER = "Track  Long(m)  Lat(m)  RelSpd(m/s)  Age(ms)"
+_BY_LONG_DIST = attrgetter("long_dist")
+_ROW_FMT = "{:>5X}  {:>7.2f}  {:>6.2f}  {:>11.2f}  {:>7.0f}".format
+# Track markers are the last hex digit of the id; lowercase flags a new track
+_MARKERS = [format(i, "X") for i in range(16)]
+_MARKERS_NEW = [marker.lower() for marker in _MARKERS]
+
+
+def _hbar(width: int) -> str:
+    bar = _HBARS.get(width)
+    if bar is None:
+        bar = _HBARS[width] = "-" * width
+    return bar
 
 
 def draw_grid(
@@ -123,16 +142,15 @@ def draw_grid(
 ) -> None:
     bottom = top + height - 1
     right = left + width - 1
+    hbar = _hbar(width)
 
-    for x in range(left, right + 1):
-        screen.addch(top, x, "-")
-        screen.addch(bottom, x, "-")
+    screen.addnstr(top, left, hbar, width)
+    screen.addnstr(bottom, left, hbar, width)
     for y in range(top, bottom + 1):
         screen.addch(y, left, "|")
         screen.addch(y, right, "|")
 
-    for x in range(left + 1, right):
-        screen.addch(origin_y, x, "-")
+    screen.addnstr(origin_y, left + 1, hbar, width - 2)
     for y in range(top + 1, bottom):
         screen.addch(y, origin_x, "|")
     screen.addch(origin_y, origin_x, "+")
@@ -154,24 +172,44 @@ def draw_tracks(
     max_lat: float,
     color_pair: int,
 ) -> None:
+    attr = curses.color_pair(color_pair) if color_pair else 0
+    addnstr = screen.addnstr
+    y_scale = grid_height - 3
+    x_scale = (grid_width - 3) / 2
+    y_lo, y_hi = grid_top + 1, grid_bottom - 1
+    x_lo, x_hi = grid_left + 1, grid_right - 1
+    rows: Dict[int, Dict[int, str]] = {}
+
     for track in tracks.values():
-        long_ratio = clamp(track.long_dist / max_long, 0.0, 1.0)
-        lat_ratio = clamp(track.lat_dist / max_lat, -1.0, 1.0)
+        # Clamp ratios inline to avoid two function calls per track
+        long_ratio = track.long_dist / max_long
+        long_ratio = 0.0 if long_ratio < 0.0 else (1.0 if long_ratio > 1.0 else long_ratio)
+        lat_ratio = track.lat_dist / max_lat
+        lat_ratio = -1.0 if lat_ratio < -1.0 else (1.0 if lat_ratio > 1.0 else lat_ratio)
 
-        rel_y = max(1, int(round(long_ratio * (grid_height - 3))))
-        rel_x = int(round(lat_ratio * ((grid_width - 3) / 2)))
+        rel_y = max(1, int(round(long_ratio * y_scale)))
+        rel_x = int(round(lat_ratio * x_scale))
 
         y = origin_y - rel_y
         x = origin_x + rel_x
 
-        if grid_top + 1 <= y <= grid_bottom - 1 and grid_left + 1 <= x <= grid_right - 1:
-            marker = format(track.track_id, "X")[-1]
-            if track.new_track:
-                marker = marker.lower()
-            if color_pair:
-                screen.addch(y, x, marker, curses.color_pair(color_pair))
-            else:
-                screen.addch(y, x, marker)
+        if y_lo <= y <= y_hi and x_lo <= x <= x_hi:
+            marker = (_MARKERS_NEW if track.new_track else _MARKERS)[track.track_id & 0xF]
+            rows.setdefault(y, {})[x] = marker
+
+    # Emit each horizontal run of adjacent markers with a single call so the
+    # grid characters between separated markers are left untouched.
+    for y, cells in rows.items():
+        columns = sorted(cells)
+        run_start = prev = columns[0]
+        for x in columns[1:] + [None]:
+            if x == prev + 1:
+                prev = x
+                continue
+            run = "".join(cells[col] for col in range(run_start, prev + 1))
+            addnstr(y, run_start, run, len(run), attr)
+            if x is not None:
+                run_start = prev = x
 
 
 def draw_info_panel(
@@ -186,20 +224,102 @@ def draw_info_panel(
     if panel_width <= 0:
         return
 
-    header = "Track  Long(m)  Lat(m)  RelSpd(m/s)  Age(ms)"
-    screen.addnstr(2, panel_x, header, panel_width - 1)
+    addnstr = screen.addnstr
+    max_chars = panel_width - 1
+    addnstr(2, panel_x, _PANEL_HEADER, max_chars)
 
-    ordered = sorted(tracks.values(), key=lambda t: t.long_dist)
-    for idx, track in enumerate(ordered[: max_rows - 3]):
+    ordered = heapq.nsmallest(max(0, max_rows - 3), tracks.values(), key=_BY_LONG_DIST)
+    for idx, track in enumerate(ordered):
         age_ms = (now - track.timestamp) * 1000.0
-        line = f"{track.track_id:>5X}  {track.long_dist:>7.2f}  {track.lat_dist:>6.2f}  {track.rel_speed:>11.2f}  {age_ms:>7.0f}"
-        screen.addnstr(3 + idx, panel_x, line, panel_width - 1)
+        line = _ROW_FMT(track.track_id, track.long_dist, track.lat_dist, track.rel_speed, age_ms)
+        addnstr(3 + idx, panel_x, line, max_chars)
+
+
+def draw_frame(
+    screen,
+    tracks: Dict[int, RadarTrack],
+    *,
+    height: int,
+    width: int,
+    rx_count: int,
+    keepalive: Optional[Dict[str, Optional[float]]],
+    args: argparse.Namespace,
+    color_pair: int,
+) -> None:
+    # Track timestamps are wall-clock; read it once per frame for ages
+    now = time.time()
+
+    screen.erase()
+
+    if width >= 80:
+        panel_width = min(max(28, int(width * 0.35)), width - 40)
+    elif width >= 60:
+        panel_width = 24
+    else:
+        panel_width = 0
+
+    if panel_width > 0:
+        panel_x = width - panel_width
+        grid_width = max(20, width - panel_width - 2)
+    else:
+        panel_x = width
+        grid_width = max(20, width - 2)
+
+    grid_height = max(10, height - 4)
+    grid_top = 2
+    grid_left = 1
+    grid_bottom = grid_top + grid_height - 1
+    grid_right = grid_left + grid_width - 1
+    origin_x = grid_left + grid_width // 2
+    origin_y = grid_top + grid_height - 2
+
+    screen.addnstr(0, 1, "Toyota Radar Tracks (press 'q' to quit)", width - 2)
+
+    status_parts = [
+        f"Tracks: {len(tracks):2d}",
+        f"Range +/-{args.max_lat:.1f}m x {args.max_long:.1f}m",
+        f"Refresh: {args.refresh_hz:.1f}Hz",
+        f"RX: {rx_count:d}",
+    ]
+    if keepalive:
+        status_parts.append(f"KA TX: {int(keepalive['tx_count']):d}")
+        if keepalive["last_error"]:
+            status_parts.append(f"ERR: {keepalive['last_error']}")
+    status_line = "  ".join(status_parts)
+    screen.addnstr(1, 1, status_line, width - 2)
+
+    draw_grid(screen, grid_top, grid_left, grid_width, grid_height, origin_x, origin_y)
+    draw_tracks(
+        screen,
+        tracks,
+        grid_top=grid_top,
+        grid_bottom=grid_bottom,
+        grid_left=grid_left,
+        grid_right=grid_right,
+        grid_width=grid_width,
+        grid_height=grid_height,
+        origin_x=origin_x,
+        origin_y=origin_y,
+        max_long=args.max_long,
+        max_lat=args.max_lat,
+        color_pair=color_pair,
+    )
+    draw_info_panel(
+        screen,
+        tracks,
+        panel_x=panel_x,
+        panel_width=panel_width,
+        max_rows=height,
+        now=now,
+    )
+
+    screen.refresh()
 
 
 def run_curses(stdscr, driver: ToyotaRadarDriver, args: argparse.Namespace) -> None:
     curses.curs_set(0)
-    stdscr.nodelay(True)
-    stdscr.timeout(0)
+    # getch() blocks for at most one refresh period, which paces the loop
+    stdscr.timeout(max(1, int(1000.0 / max(args.refresh_hz, 1.0))))
 
     color_pair = 0
     if curses.has_colors():
@@ -207,90 +327,53 @@ def run_curses(stdscr, driver: ToyotaRadarDriver, args: argparse.Namespace) -> N
         curses.init_pair(1, curses.COLOR_CYAN, -1)
         color_pair = 1
 
-    refresh_delay = 1.0 / max(args.refresh_hz, 1.0)
+    last_signature = None
+    tracks: Dict[int, RadarTrack] = {}
+    tracks_version = None
+    snapshot = 0
+    track_timeout = driver.config.track_timeout
+    refresh_hz = max(args.refresh_hz, 1.0)
 
     while True:
-        loop_start = time.time()
-
-        tracks = driver.get_tracks()
-        now = time.time()
-
-        stdscr.erase()
+        # Only copy the driver's track cache when it changed or may hold stale tracks
+        version = driver.tracks_version()
+        cutoff = time.time() - track_timeout
+        if version != tracks_version or any(t.timestamp < cutoff for t in tracks.values()):
+            tracks_version = version
+            tracks = driver.get_tracks()
+            snapshot += 1
         height, width = stdscr.getmaxyx()
-
-        if width >= 80:
-            panel_width = min(max(28, int(width * 0.35)), width - 40)
-        elif width >= 60:
-            panel_width = 24
-        else:
-            panel_width = 0
-
-        if panel_width > 0:
-            panel_x = width - panel_width
-            grid_width = max(20, width - panel_width - 2)
-        else:
-            panel_x = width
-            grid_width = max(20, width - 2)
-
-        grid_height = max(10, height - 4)
-        grid_top = 2
-        grid_left = 1
-        grid_bottom = grid_top + grid_height - 1
-        grid_right = grid_left + grid_width - 1
-        origin_x = grid_left + grid_width // 2
-        origin_y = grid_top + grid_height - 2
-
-        stdscr.addnstr(0, 1, "Toyota Radar Tracks (press 'q' to quit)", width - 2)
-
-        status_parts = [
-            f"Tracks: {len(tracks):2d}",
-            f"Range +/-{args.max_lat:.1f}m x {args.max_long:.1f}m",
-            f"Refresh: {args.refresh_hz:.1f}Hz",
-            f"RX: {driver.message_count():d}",
-        ]
+        rx_count = driver.message_count()
         keepalive = driver.keepalive_status()
-        if keepalive:
-            status_parts.append(f"KA TX: {int(keepalive['tx_count']):d}")
-            if keepalive["last_error"]:
-                status_parts.append(f"ERR: {keepalive['last_error']}")
-        status_line = "  ".join(status_parts)
-        stdscr.addnstr(1, 1, status_line, width - 2)
-
-        draw_grid(stdscr, grid_top, grid_left, grid_width, grid_height, origin_x, origin_y)
-        draw_tracks(
-            stdscr,
-            tracks,
-            grid_top=grid_top,
-            grid_bottom=grid_bottom,
-            grid_left=grid_left,
-            grid_right=grid_right,
-            grid_width=grid_width,
-            grid_height=grid_height,
-            origin_x=origin_x,
-            origin_y=origin_y,
-            max_long=args.max_long,
-            max_lat=args.max_lat,
-            color_pair=color_pair,
-        )
-        draw_info_panel(
-            stdscr,
-            tracks,
-            panel_x=panel_x,
-            panel_width=panel_width,
-            max_rows=height,
-            now=now,
-        )
 
-        stdscr.refresh()
+        # Skip the redraw entirely when nothing visible has changed
+        signature = (
+            height,
+            width,
+            rx_count,
+            (keepalive["tx_count"], keepalive["last_error"]) if keepalive else None,
+            snapshot,
+            # Age(ms) advances with wall time, so redraw every refresh
+            # period while any track is on screen
+            int(time.monotonic() * refresh_hz) if tracks else None,
+        )
+        if signature != last_signature:
+            last_signature = signature
+            draw_frame(
+                stdscr,
+                tracks,
+                height=height,
+                width=width,
+                rx_count=rx_count,
+                keepalive=keepalive,
+                args=args,
+                color_pair=color_pair,
+            )
 
         key = stdscr.getch()
         if key in (ord("q"), ord("Q")):
             break
 
-        elapsed = time.time() - loop_start
-        if elapsed < refresh_delay:
-            time.sleep(refresh_delay - elapsed)
-
 
 def main() -> None:
     args = parse_args()
@@ -310,6 +393,7 @@ def main() -> None:
         use_sudo=args.use_sudo,
         setup_extra_args=args.setup_extra,
         keepalive_enabled=not args.no_keepalive,
+        keepalive_periodic=args.periodic_keepalive,
     )
 
     driver = ToyotaRadarDriver(config)
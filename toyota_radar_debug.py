@@ -2,9 +2,12 @@
 
 import cantools
 import can
+import math
+import threading
 import time
 import sys
 import os
+from collections import deque
 
 """
 DEBUG VERSION - Shows all CAN activity
@@ -12,48 +15,147 @@ Raspberry Pi version for Waveshare Dual CAN Hat
 """
 
 
+def _big_endian_field(signal):
+    """Return (shift, mask) to pull an unsigned Motorola signal out of an
+    8-byte payload read with int.from_bytes(data, "big"), or None."""
+    if signal is None or signal.byte_order != "big_endian" or signal.is_signed:
+        return None
+    msb = (7 - signal.start // 8) * 8 + signal.start % 8
+    shift = msb - signal.length + 1
+    if shift < 0:
+        return None
+    return shift, (1 << signal.length) - 1
+
+
+def _track_layout(message):
+    """Bit positions of VALID and LONG_DIST in a track message, or None."""
+    signals = {signal.name: signal for signal in message.signals}
+    valid = _big_endian_field(signals.get("VALID"))
+    dist = _big_endian_field(signals.get("LONG_DIST"))
+    if message.length != 8 or valid is None or dist is None:
+        return None
+    long_dist = signals["LONG_DIST"]
+    return valid + dist + (long_dist.scale, long_dist.offset)
+
+
 class OnCan(can.Listener):
-    def __init__(self):
+    def __init__(self, db=None):
+        """Pass an already-loaded ADAS database as db to skip parsing it again."""
         self.msg_count = 0
         self.valid_tracks = 0
-        try:
-            self.db = cantools.database.load_file(
-                "opendbc/toyota_prius_2017_adas.dbc", strict=False
-            )
-            print("✓ OnCan listener: DBC loaded")
-        except FileNotFoundError:
-            print("Warning: DBC file not found for listener")
-            self.db = None
-        except Exception as e:
-            print(f"Warning: Could not load DBC file for listener: {e}")
-            self.db = None
+        # (arbitration_id, data, note) entries, printed in batches by a
+        # flusher thread so the TX loop never blocks on stdout. Once the
+        # main loop runs, its output goes through post() for the same reason.
+        self._ring = deque(maxlen=2048)
+        self._flush_stop = threading.Event()
+        self._flusher = None
+        self.db = db
+        if self.db is None:
+            try:
+                self.db = cantools.database.load_file(
+                    "opendbc/toyota_prius_2017_adas.dbc", strict=False
+                )
+                print("✓ OnCan listener: DBC loaded")
+            except FileNotFoundError:
+                print("Warning: DBC file not found for listener")
+            except Exception as e:
+                print(f"Warning: Could not load DBC file for listener: {e}")
+        # Resolve track ids to their Message once instead of per frame
+        self._track_messages = {}
+        if self.db:
+            self._track_messages = {
+                message.frame_id: message
+                for message in self.db.messages
+                if 0x210 <= message.frame_id <= 0x21F
+            }
+        # Only VALID and LONG_DIST are shown, so read them straight from
+        # the payload bits instead of decoding every signal
+        self._track_layouts = {
+            frame_id: _track_layout(message)
+            for frame_id, message in self._track_messages.items()
+        }
 
     def on_message_received(self, msg):
         self.msg_count += 1
 
-        # Print ALL messages from radar bus (can1)
-        print(
-            f"[RX] ID: 0x{msg.arbitration_id:03X} Data: {msg.data.hex().upper()} ({len(msg.data)} bytes)"
-        )
+        # Queue ALL messages from radar bus (can1)
+        arbitration_id = msg.arbitration_id
+        note = None
 
         # Check if it's a radar track message
-        if 0x210 <= msg.arbitration_id <= 0x21F:
+        if 0x210 <= arbitration_id <= 0x21F:
             if self.db:
-                try:
-                    decoded = self.db.decode_message(msg.arbitration_id, msg.data)
-                    if decoded.get("VALID") == 1:
-                        self.valid_tracks += 1
-                        print(
-                            f"  *** VALID TRACK at dist: {decoded.get('LONG_DIST', 'N/A')} m ***"
-                        )
-                    else:
-                        print(
-                            f"  (Track message, but VALID={decoded.get('VALID', 'N/A')})"
-                        )
-                except Exception as e:
-                    print(f"  (Could not decode: {e})")
+                message = self._track_messages.get(arbitration_id)
+                if message is None:
+                    note = f"  (Could not decode: 0x{arbitration_id:03X} not in DBC)"
+                else:
+                    data = msg.data
+                    layout = self._track_layouts[arbitration_id]
+                    try:
+                        if layout is not None and len(data) == 8:
+                            v_shift, v_mask, d_shift, d_mask, scale, offset = layout
+                            raw = int.from_bytes(data, "big")
+                            valid = (raw >> v_shift) & v_mask
+                            long_dist = ((raw >> d_shift) & d_mask) * scale + offset
+                        else:
+                            decoded = message.decode(data)
+                            valid = decoded.get("VALID", "N/A")
+                            long_dist = decoded.get("LONG_DIST", "N/A")
+                        if valid == 1:
+                            self.valid_tracks += 1
+                            note = f"  *** VALID TRACK at dist: {long_dist} m ***"
+                        else:
+                            note = f"  (Track message, but VALID={valid})"
+                    except Exception as e:
+                        note = f"  (Could not decode: {e})"
             else:
-                print(f"  (Radar track message - no DBC to decode)")
+                note = "  (Radar track message - no DBC to decode)"
+
+        self._ring.append((arbitration_id, msg.data, note))
+
+    def start_flusher(self, interval=0.05):
+        """Print queued RX lines from a daemon thread every interval seconds."""
+        self._flusher = threading.Thread(
+            target=self._flush_loop, args=(interval,), daemon=True
+        )
+        self._flusher.start()
+
+    def stop_flusher(self):
+        """Stop the flusher thread and print whatever is still queued."""
+        self._flush_stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def _flush_loop(self, interval):
+        # Threads inherit SCHED_FIFO from enable_realtime(); printing must
+        # not compete with the TX loop, so drop back to normal scheduling
+        try:
+            os.sched_setscheduler(0, os.SCHED_OTHER, os.sched_param(0))
+        except (AttributeError, OSError):
+            pass
+        while not self._flush_stop.wait(interval):
+            self.flush()
+
+    def post(self, text):
+        """Queue a line of non-RX output for the flusher thread."""
+        self._ring.append((None, None, text))
+
+    def flush(self):
+        """Print queued RX lines in one write."""
+        ring = self._ring
+        lines = []
+        while ring:
+            arbitration_id, data, note = ring.popleft()
+            if arbitration_id is not None:
+                lines.append(
+                    f"[RX] ID: 0x{arbitration_id:03X} Data: {data.hex().upper()} ({len(data)} bytes)\n"
+                )
+            if note:
+                lines.append(note + "\n")
+        if lines:
+            sys.stdout.write("".join(lines))
+            sys.stdout.flush()
 
 
 class ECU:
@@ -132,12 +234,34 @@ STATIC_MSGS = [
 ]
 
 
+# At most this many RX frames are handled per 10 ms tick; 64 per tick
+# (6400/s) is above what a 500 kbit/s bus can carry
+RX_DRAIN_MAX = 64
+
+
 def check_can_interface(interface):
+    # sysfs lists every network interface; no need to fork `ip link show`
+    return os.path.isdir(f"/sys/class/net/{interface}")
+
+
+def enable_realtime(cpu=3, priority=50):
+    """Pin to one core and switch to SCHED_FIFO to cut TX jitter.
+
+    Works best with that core reserved via the isolcpus=3 kernel boot arg
+    (cmdline.txt on the Pi). Failures are reported and otherwise ignored.
+    """
+    # No membership pre-check: under isolcpus the inherited mask excludes
+    # the isolated core, but setting affinity onto it is still allowed
     try:
-        result = os.system(f"ip link show {interface} > /dev/null 2>&1")
-        return result == 0
-    except Exception:
-        return False
+        os.sched_setaffinity(0, {cpu})
+        print(f"✓ Pinned to CPU {cpu}")
+    except (AttributeError, OSError) as e:
+        print(f"Warning: Could not pin to CPU {cpu}: {e}")
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+        print(f"✓ SCHED_FIFO priority {priority}")
+    except (AttributeError, OSError) as e:
+        print(f"Warning: Could not enable real-time scheduling: {e}")
 
 
 if __name__ == "__main__":
@@ -177,6 +301,9 @@ if __name__ == "__main__":
         print(f"ERROR: Failed to initialize CAN buses: {e}")
         sys.exit(1)
 
+    if os.geteuid() == 0:
+        enable_realtime()
+
     try:
         db = cantools.database.load_file(
             "opendbc/toyota_prius_2017_pt_generated.dbc", strict=False
@@ -192,9 +319,11 @@ if __name__ == "__main__":
     print("Press Ctrl+C to stop")
     print("=" * 70 + "\n")
 
-    # Setup notifier
+    # RX is drained from the main loop, so no Notifier thread is needed
     listener = OnCan()
-    notifier = can.Notifier(can_bus2, [listener], timeout=0.1)
+    radar_recv = can_bus2.recv
+    on_radar_message = listener.on_message_received
+    listener.start_flusher()
 
     try:
         acc_message = db.get_message_by_name("ACC_CONTROL")
@@ -288,74 +417,113 @@ if __name__ == "__main__":
 
         last_status = time.time()
 
+        # Static payloads never change, so build their Messages once.
+        # The 0x489/0x48A counter frames get a trailing byte patched in place
+        # (python-can keeps a bytearray passed as data without copying).
+        # The schedule repeats every LCM(steps) ticks (2100 for 2/3/5/7/20/100),
+        # so precompute which entries fire on each tick of that cycle.
+        static_entries = []
+        for addr, ecu, cars, bus, fr_step, vl in STATIC_MSGS:
+            can_bus = can_bus1 if bus == 0 else can_bus2
+            if addr in (0x489, 0x48A) and bus == 0:
+                counter_base = 1 << 7 if addr == 0x48A else 0
+                data = bytearray(vl + b"\x00")
+            else:
+                counter_base = None
+                data = vl
+            message = can.Message(arbitration_id=addr, data=data, is_extended_id=False)
+            static_entries.append((fr_step, (can_bus, message, counter_base)))
+        cycle = 1
+        for fr_step, _entry in static_entries:
+            cycle = cycle * fr_step // math.gcd(cycle, fr_step)
+        static_wheel = [[] for _ in range(cycle)]
+        for fr_step, entry in static_entries:
+            for tick in range(0, cycle, fr_step):
+                static_wheel[tick].append(entry)
+
+        # ACC_CONTROL content is constant, so encode it once
+        acc_frame = can.Message(
+            arbitration_id=acc_message.frame_id,
+            data=acc_message.encode(
+                {
+                    "ACCEL_CMD": 0.0,
+                    "SET_ME_X63": 0x63,
+                    "SET_ME_1": 1,
+                    "RELEASE_STANDSTILL": 1,
+                    "CANCEL_REQ": 0,
+                    "CHECKSUM": 113,
+                }
+            ),
+            is_extended_id=False,
+        )
+
+        # Pace on absolute deadlines so late wake-ups do not accumulate drift
+        period_ns = 10_000_000  # 100 Hz
+        next_deadline = time.monotonic_ns()
+
         # Main loop
         while True:
             # Send ACC control message every frame
-            if frame % 1 == 0:
-                acc_msg = acc_message.encode(
-                    {
-                        "ACCEL_CMD": 0.0,
-                        "SET_ME_X63": 0x63,
-                        "SET_ME_1": 1,
-                        "RELEASE_STANDSTILL": 1,
-                        "CANCEL_REQ": 0,
-                        "CHECKSUM": 113,
-                    }
-                )
-                msg = can.Message(
-                    arbitration_id=acc_message.frame_id,
-                    data=acc_msg,
-                    is_extended_id=False,
-                )
-                can_bus1.send(msg)
-                tx_count += 1
+            can_bus1.send(acc_frame)
+            tx_count += 1
 
             # Send static DSU messages
-            for addr, ecu, cars, bus, fr_step, vl in STATIC_MSGS:
-                if frame % fr_step == 0:
-                    tosend = bytearray(vl)
-                    if addr in (0x489, 0x48A) and bus == 0:
-                        cnt = int((frame / 100) % 0xF) + 1
-                        if addr == 0x48A:
-                            cnt += 1 << 7
-                        tosend.append(cnt)
-
-                    can_bus = can_bus1 if bus == 0 else can_bus2
-                    message = can.Message(
-                        arbitration_id=addr, data=bytes(tosend), is_extended_id=False
-                    )
-                    can_bus.send(message)
-                    tx_count += 1
+            for can_bus, message, counter_base in static_wheel[frame % cycle]:
+                if counter_base is not None:
+                    message.data[-1] = counter_base + (frame // 100) % 0xF + 1
+                can_bus.send(message)
+                tx_count += 1
+
+            # Drain what the radar bus queued since the last tick, bounded so
+            # a busy bus cannot push keep-alive TX past the next deadline.
+            # Leftovers stay in the socket's kernel queue for the next tick.
+            rx_deadline = next_deadline + period_ns
+            for _ in range(RX_DRAIN_MAX):
+                rx_msg = radar_recv(0.0)
+                if rx_msg is None:
+                    break
+                on_radar_message(rx_msg)
+                if time.monotonic_ns() >= rx_deadline:
+                    break
 
             # Print status every 5 seconds
             if time.time() - last_status >= 5.0:
-                print(f"\n--- STATUS (frame {int(frame)}) ---")
-                print(f"TX messages sent: {tx_count}")
-                print(f"RX messages received: {listener.msg_count}")
-                print(f"Valid tracks detected: {listener.valid_tracks}")
-                print("---\n")
+                # Queued rather than printed so a slow stdout cannot stall TX
+                listener.post(
+                    f"\n--- STATUS (frame {frame}) ---\n"
+                    f"TX messages sent: {tx_count}\n"
+                    f"RX messages received: {listener.msg_count}\n"
+                    f"Valid tracks detected: {listener.valid_tracks}\n"
+                    "---\n"
+                )
                 last_status = time.time()
 
-            frame += 1.0
-            time.sleep(1.0 / 100)  # 100 Hz
+            frame += 1
+            next_deadline += period_ns
+            delay = next_deadline - time.monotonic_ns()
+            if delay > 0:
+                time.sleep(delay / 1e9)
+            else:
+                # Overran a whole tick; resync rather than burst to catch up
+                next_deadline = time.monotonic_ns()
 
     except KeyboardInterrupt:
+        listener.stop_flusher()
         print("\n\nStopping radar control...")
         print(f"\nFinal Statistics:")
         print(f"  TX messages sent: {tx_count}")
         print(f"  RX messages received: {listener.msg_count}")
         print(f"  Valid tracks detected: {listener.valid_tracks}")
     except Exception as e:
+        listener.stop_flusher()
         print(f"\nERROR: {e}")
         import traceback
 
         traceback.print_exc()
     finally:
+        # Idempotent; prints any RX lines still queued on every exit path
+        listener.stop_flusher()
         print("\nCleaning up...")
-        try:
-            notifier.stop()
-        except:
-            pass
         try:
             can_bus1.shutdown()
         except:
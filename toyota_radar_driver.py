@@ -7,6 +7,8 @@ management, and callback hooks for downstream consumers.
 from __future__ import annotations
 
 import dataclasses
+import functools
+import math
 import os
 import subprocess
 import threading
@@ -40,6 +42,39 @@ STATIC_MSGS = [
 ]
 
 
+ACC_KEEPALIVE_SIGNALS = {
+    "ACCEL_CMD": 0.0,
+    "SET_ME_X63": 0x63,
+    "SET_ME_1": 1,
+    "RELEASE_STANDSTILL": 1,
+    "CANCEL_REQ": 0,
+    "CHECKSUM": 113,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_dbc(path: str, mtime: float):
+    """Parse a DBC once per (path, mtime) so driver restarts skip the slow parse."""
+    return cantools.database.load_file(path, strict=False)
+
+
+def _build_schedule(frames: List[tuple]) -> List[List[tuple]]:
+    """Expand (addr, bus, step, ...) entries into per-tick lists over one LCM cycle."""
+    cycle = 1
+    for _addr, _bus_sel, step, *_rest in frames:
+        cycle = cycle * step // math.gcd(cycle, step)
+    schedule: List[List[tuple]] = [[] for _ in range(cycle)]
+    for entry in frames:
+        for tick in range(0, cycle, entry[2]):
+            schedule[tick].append(entry)
+    return schedule
+
+
+def _has_counter(addr: int, bus_sel: int) -> bool:
+    """0x489/0x48A on the car bus carry a rolling counter byte."""
+    return addr in (0x489, 0x48A) and bus_sel == 0
+
+
 @dataclasses.dataclass
 class ToyotaRadarConfig:
     radar_channel: str = "can1"
@@ -57,6 +92,7 @@ class ToyotaRadarConfig:
     use_sudo: bool = False
     setup_extra_args: Iterable[str] = dataclasses.field(default_factory=list)
     keepalive_enabled: bool = True
+    keepalive_periodic: bool = False
 
 
 @dataclasses.dataclass
@@ -83,71 +119,111 @@ class RadarKeepAlive(threading.Thread):
         radar_bus: can.BusABC,
         control_db,
         rate_hz: float,
+        periodic: bool = False,
     ) -> None:
         super().__init__(daemon=True, name="ToyotaRadarKeepAlive")
         self._car_bus = car_bus
         self._radar_bus = radar_bus
         self._control_db = control_db
         self._period = 1.0 / max(rate_hz, 1.0)
+        self._periodic = periodic
+        self._periodic_tasks: List[can.broadcastmanager.CyclicSendTaskABC] = []
         self._stop = threading.Event()
         self.tx_count = 0
         self.last_error: Optional[str] = None
+        # Set once by _start_periodic(); unlike last_error, ticks never clear it
+        self.setup_error: Optional[str] = None
         self._acc_message = control_db.get_message_by_name("ACC_CONTROL")
         self._frame = 0
 
+        # Every keep-alive payload is constant, so encode and wrap them once
+        # instead of rebuilding Message objects on each 100 Hz tick.
+        self._acc_frame: Optional[can.Message] = None
+        if self._acc_message:
+            self._acc_frame = can.Message(
+                arbitration_id=self._acc_message.frame_id,
+                data=self._acc_message.encode(ACC_KEEPALIVE_SIGNALS),
+                is_extended_id=False,
+            )
+        self._static_frames = [
+            (
+                addr,
+                bus_sel,
+                step,
+                payload,
+                None
+                if _has_counter(addr, bus_sel)
+                else can.Message(arbitration_id=addr, data=payload, is_extended_id=False),
+            )
+            for addr, _ecu, bus_sel, step, payload in STATIC_MSGS
+        ]
+        self._schedule = _build_schedule(self._static_frames)
+
     def stop(self) -> None:
         self._stop.set()
 
     def run(self) -> None:  # pragma: no cover - requires hardware
-        while not self._stop.is_set():
-            start = time.time()
+        if self._periodic:
+            self._start_periodic()
+        # Pace against absolute monotonic deadlines so send time and sleep
+        # overshoot do not accumulate into drift.
+        deadline = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                try:
+                    self._send_frame()
+                    self.last_error = None
+                except Exception as exc:
+                    self.last_error = str(exc)
+                self._frame += 1
+                deadline += self._period
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._stop.wait(remaining)
+                elif remaining < -self._period:
+                    # Fell more than a tick behind; resync instead of bursting
+                    deadline = time.monotonic()
+        finally:
+            for task in self._periodic_tasks:
+                task.stop()
+            self._periodic_tasks = []
+
+    def _start_periodic(self) -> None:
+        """Hand constant frames to python-can's cyclic sender (SocketCAN BCM).
+
+        Frames whose task cannot be created stay in the Python loop.
+        """
+        remaining = []
+        for entry in self._static_frames:
+            addr, bus_sel, step, _payload, message = entry
+            if message is None:
+                remaining.append(entry)
+                continue
+            bus = self._car_bus if bus_sel == 0 else self._radar_bus
             try:
-                self._send_frame()
-                self.last_error = None
+                self._periodic_tasks.append(bus.send_periodic(message, step * self._period))
             except Exception as exc:
-                self.last_error = str(exc)
-            self._frame += 1
-            elapsed = time.time() - start
-            remaining = self._period - elapsed
-            if remaining > 0:
-                self._stop.wait(remaining)
+                self.setup_error = f"send_periodic 0x{addr:03X}: {exc}"
+                remaining.append(entry)
+        self._static_frames = remaining
+        self._schedule = _build_schedule(remaining)
 
     def _send_frame(self) -> None:
-        if self._acc_message:
-            payload = self._acc_message.encode(
-                {
-                    "ACCEL_CMD": 0.0,
-                    "SET_ME_X63": 0x63,
-                    "SET_ME_1": 1,
-                    "RELEASE_STANDSTILL": 1,
-                    "CANCEL_REQ": 0,
-                    "CHECKSUM": 113,
-                }
-            )
-            self._car_bus.send(
-                can.Message(
-                    arbitration_id=self._acc_message.frame_id,
-                    data=payload,
-                    is_extended_id=False,
-                )
-            )
+        if self._acc_frame is not None:
+            self._car_bus.send(self._acc_frame)
             self.tx_count += 1
 
-        for addr, _ecu, bus_sel, step, payload in STATIC_MSGS:
-            if self._frame % step != 0:
-                continue
-
-            data = bytearray(payload)
-            if addr in (0x489, 0x48A) and bus_sel == 0:
+        for addr, bus_sel, _step, payload, message in self._schedule[self._frame % len(self._schedule)]:
+            if message is None:
+                data = bytearray(payload)
                 cnt = int((self._frame / 100) % 0xF) + 1
                 if addr == 0x48A:
                     cnt |= 1 << 7
                 data.append(cnt)
+                message = can.Message(arbitration_id=addr, data=bytes(data), is_extended_id=False)
 
             bus = self._car_bus if bus_sel == 0 else self._radar_bus
-            bus.send(
-                can.Message(arbitration_id=addr, data=bytes(data), is_extended_id=False)
-            )
+            bus.send(message)
             self.tx_count += 1
 
 
@@ -169,11 +245,13 @@ class ToyotaRadarDriver:
         self._notifier: Optional[can.Notifier] = None
         self._buffered_reader: Optional[can.BufferedReader] = None
         self._track_db = None
+        self._track_messages: Dict[int, cantools.database.Message] = {}
         self._control_db = None
         self._keepalive: Optional[RadarKeepAlive] = None
         self._track_callbacks: List[TrackCallback] = []
         self._raw_callbacks: List[RawMessageCallback] = []
         self._tracks: Dict[int, RadarTrack] = {}
+        self._tracks_version = 0
         self._lock = threading.Lock()
         self._running = False
         self._rx_count = 0
@@ -193,6 +271,11 @@ class ToyotaRadarDriver:
             self._setup_interfaces()
 
         self._track_db = self._load_dbc(self.config.radar_dbc, "Radar")
+        self._track_messages = {
+            message.frame_id: message
+            for message in self._track_db.messages
+            if TRACK_BASE_ID <= message.frame_id <= TRACK_MAX_ID
+        }
         self._control_db = self._load_dbc(self.config.control_dbc, "Control")
 
         car_if = self.config.car_interface or self.config.interface
@@ -217,6 +300,7 @@ class ToyotaRadarDriver:
                 self._radar_bus,
                 self._control_db,
                 rate_hz=self.config.keepalive_rate_hz,
+                periodic=self.config.keepalive_periodic,
             )
             self._keepalive.start()
 
@@ -257,12 +341,22 @@ class ToyotaRadarDriver:
             stale = [track_id for track_id, track in self._tracks.items() if track.timestamp < cutoff]
             for track_id in stale:
                 self._tracks.pop(track_id, None)
+            if stale:
+                self._tracks_version += 1
             return dict(self._tracks)
 
+    def tracks_version(self) -> int:
+        """Counter bumped whenever the cached track set changes."""
+        return self._tracks_version
+
     def keepalive_status(self) -> Optional[Dict[str, Optional[float]]]:
         if not self._keepalive:
             return None
-        return {"tx_count": self._keepalive.tx_count, "last_error": self._keepalive.last_error}
+        keepalive = self._keepalive
+        return {
+            "tx_count": keepalive.tx_count,
+            "last_error": keepalive.last_error or keepalive.setup_error,
+        }
 
     def message_count(self) -> int:
         return self._rx_count
@@ -270,23 +364,24 @@ class ToyotaRadarDriver:
     # --- internals ------------------------------------------------------
     def _handle_message(self, msg: can.Message) -> None:
         self._rx_count += 1
-        if not (
-            TRACK_BASE_ID <= msg.arbitration_id <= TRACK_MAX_ID
-            and self._track_db is not None
-        ):
+        arbitration_id = msg.arbitration_id
+        # _track_messages only holds DBC-defined ids in 0x210-0x21F, so a
+        # single lookup replaces the range and DBC-loaded checks.
+        message = self._track_messages.get(arbitration_id)
+        if message is None:
             for cb in self._raw_callbacks:
                 cb(msg)
             return
 
         try:
-            decoded = self._track_db.decode_message(msg.arbitration_id, msg.data)
+            decoded = message.decode(msg.data)
         except Exception:
             return
 
         if decoded.get("VALID", 0) != 1:
             return
 
-        track_id = msg.arbitration_id - TRACK_BASE_ID
+        track_id = arbitration_id - TRACK_BASE_ID
         track = RadarTrack(
             track_id=track_id,
             long_dist=decoded.get("LONG_DIST", 0.0),
@@ -299,6 +394,7 @@ class ToyotaRadarDriver:
 
         with self._lock:
             self._tracks[track_id] = track
+            self._tracks_version += 1
 
         for callback in self._track_callbacks:
             try:
@@ -309,7 +405,7 @@ class ToyotaRadarDriver:
     def _load_dbc(self, path: str, label: str):
         if not os.path.exists(path):
             raise FileNotFoundError(f"{label} DBC not found: {path}")
-        return cantools.database.load_file(path, strict=False)
+        return _parse_dbc(os.path.abspath(path), os.path.getmtime(path))
 
     def _send_initial_messages(self) -> None:
         if not self._control_db or not self._car_bus:
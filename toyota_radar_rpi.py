@@ -1,8 +1,11 @@
 #!/usr/bin/python3
 
+import functools
+import math
 import cantools
 import can
 import time
+import subprocess
 import sys
 import os
 
@@ -34,32 +37,51 @@ iface can1 inet manual
 """
 
 
+ADAS_DBC = "opendbc/toyota_prius_2017_adas.dbc"
+PT_DBC = "opendbc/toyota_prius_2017_pt_generated.dbc"
+
+
+@functools.lru_cache(maxsize=None)
+def _load_dbc(path):
+    """Parse a DBC once per path; later calls share the same database."""
+    return cantools.database.load_file(path, strict=False)
+
+
 class OnCan(can.Listener):
-    def __init__(self):
-        try:
-            self.db = cantools.database.load_file(
-                "opendbc/toyota_prius_2017_adas.dbc", strict=False
-            )
-        except FileNotFoundError:
-            print("Warning: DBC file not found. Run: git submodule update --init")
-            self.db = None
-        except Exception as e:
-            print(f"Warning: Could not load DBC file: {e}")
-            self.db = None
+    def __init__(self, db=None):
+        self.db = db
+        if self.db is None:
+            try:
+                self.db = _load_dbc(ADAS_DBC)
+            except FileNotFoundError:
+                print("Warning: DBC file not found. Run: git submodule update --init")
+            except Exception as e:
+                print(f"Warning: Could not load DBC file: {e}")
+        # Resolve track ids to their Message once; unknown ids skip decode
+        # without going through cantools' KeyError path
+        self._radar_msgs = {}
+        if self.db:
+            self._radar_msgs = {
+                m.frame_id: m for m in self.db.messages if 0x210 <= m.frame_id < 0x21F
+            }
 
     def on_message_received(self, boo):
-        if 0x210 <= boo.arbitration_id < 0x21F:
+        arbitration_id = boo.arbitration_id
+        if 0x210 <= arbitration_id < 0x21F:
             if self.db:
+                m = self._radar_msgs.get(arbitration_id)
+                if m is None:
+                    return
                 try:
-                    msg = self.db.decode_message(boo.arbitration_id, boo.data)
-                    if msg["VALID"] == 1:
-                        print("Got VALID track at dist: " + str(msg["LONG_DIST"]))
-                except Exception as e:
-                    pass  # Silently ignore decode errors
+                    msg = m.decode(boo.data)
+                except Exception:
+                    return  # Silently ignore malformed frames
+                if msg.get("VALID") == 1:
+                    print("Got VALID track at dist: " + str(msg.get("LONG_DIST")))
             else:
                 # If no DBC, just print raw data
                 print(
-                    f"Radar message: ID=0x{boo.arbitration_id:x}, Data={boo.data.hex()}"
+                    f"Radar message: ID=0x{arbitration_id:x}, Data={boo.data.hex()}"
                 )
 
 
@@ -142,22 +164,74 @@ STATIC_MSGS = [
 
 def check_can_interface(interface):
     """Check if CAN interface exists and is operational"""
-    try:
-        result = os.system(f"ip link show {interface} > /dev/null 2>&1")
-        return result == 0
-    except Exception:
-        return False
+    # sysfs lists every network interface; no need to fork `ip link show`
+    return os.path.isdir(f"/sys/class/net/{interface}")
 
 
 def setup_can_interface(interface, bitrate=500000):
     """Attempt to configure CAN interface"""
     print(f"Setting up {interface}...")
-    os.system(f"sudo ip link set {interface} type can bitrate {bitrate}")
-    os.system(f"sudo ip link set {interface} up")
+    for args in (
+        ["sudo", "ip", "link", "set", interface, "type", "can", "bitrate", str(bitrate)],
+        ["sudo", "ip", "link", "set", interface, "up"],
+    ):
+        try:
+            subprocess.run(args, check=False)
+        except OSError as e:
+            print(f"Warning: {' '.join(args)} failed: {e}")
     time.sleep(0.5)
     return check_can_interface(interface)
 
 
+def move_can_irqs(cpu, names=("can0", "can1", "mcp251")):
+    """Steer CAN controller IRQs (MCP2515 on the Waveshare hat) off cpu.
+
+    Failures are reported and otherwise ignored.
+    """
+    mask = ((1 << (os.cpu_count() or 1)) - 1) & ~(1 << cpu)
+    if not mask:
+        print(f"Warning: No other CPU to move CAN IRQs off CPU {cpu}")
+        return
+    try:
+        with open("/proc/interrupts") as f:
+            lines = f.readlines()
+    except OSError as e:
+        print(f"Warning: Could not read /proc/interrupts: {e}")
+        return
+    for line in lines:
+        irq = line.split(":", 1)[0].strip()
+        if not irq.isdigit() or not any(name in line for name in names):
+            continue
+        try:
+            with open(f"/proc/irq/{irq}/smp_affinity", "w") as f:
+                f.write(f"{mask:x}")
+            print(f"✓ Moved IRQ {irq} off CPU {cpu}")
+        except OSError as e:
+            print(f"Warning: Could not move IRQ {irq}: {e}")
+
+
+def enable_realtime(cpu=3, priority=50):
+    """Pin to one core, move CAN IRQs elsewhere and switch to SCHED_FIFO
+    to cut loop jitter.
+
+    Works best with that core reserved via the isolcpus=3 kernel boot arg
+    (cmdline.txt on the Pi). Failures are reported and otherwise ignored.
+    """
+    # No membership pre-check: under isolcpus the inherited mask excludes
+    # the isolated core, but setting affinity onto it is still allowed
+    try:
+        os.sched_setaffinity(0, {cpu})
+        print(f"✓ Pinned to CPU {cpu}")
+    except (AttributeError, OSError) as e:
+        print(f"Warning: Could not pin to CPU {cpu}: {e}")
+    move_can_irqs(cpu)
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+        print(f"✓ SCHED_FIFO priority {priority}")
+    except (AttributeError, OSError) as e:
+        print(f"Warning: Could not enable real-time scheduling: {e}")
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("Toyota Radar Control - Raspberry Pi with Waveshare CAN Hat")
@@ -199,19 +273,25 @@ if __name__ == "__main__":
         can_bus1 = can.interface.Bus(
             interface="socketcan", channel="can1", bitrate=500000
         )
+        # OnCan only looks at radar tracks (0x210-0x21F), so have the kernel
+        # drop everything else (CAN_RAW_FILTER) before it reaches Python
         can_bus2 = can.interface.Bus(
-            interface="socketcan", channel="can0", bitrate=500000
+            interface="socketcan",
+            channel="can0",
+            bitrate=500000,
+            can_filters=[{"can_id": 0x210, "can_mask": 0x7F0, "extended": False}],
         )
         print("✓ CAN buses initialized successfully")
     except Exception as e:
         print(f"ERROR: Failed to initialize CAN buses: {e}")
         sys.exit(1)
 
+    if os.geteuid() == 0:
+        enable_realtime()
+
     try:
         # Try to load DBC file with strict=False to handle parsing errors
-        db = cantools.database.load_file(
-            "opendbc/toyota_prius_2017_pt_generated.dbc", strict=False
-        )
+        db = _load_dbc(PT_DBC)
         print("✓ DBC file loaded (non-strict mode)")
     except FileNotFoundError:
         print("ERROR: DBC file not found!")
@@ -222,9 +302,7 @@ if __name__ == "__main__":
         print("\nTrying alternative DBC file...")
         try:
             # Try the ADAS DBC as fallback
-            db = cantools.database.load_file(
-                "opendbc/toyota_prius_2017_adas.dbc", strict=False
-            )
+            db = _load_dbc(ADAS_DBC)
             print("✓ Loaded alternative DBC file")
         except:
             print("ERROR: Could not load any DBC file. Exiting.")
@@ -235,15 +313,31 @@ if __name__ == "__main__":
     print("Press Ctrl+C to stop")
     print("=" * 60 + "\n")
 
-    # Setup notifier to listen for radar responses
-    notifier = can.Notifier(can_bus2, [OnCan()], timeout=0.1)
+    # Radar responses are read by the main loop while it waits for each
+    # tick, so no Notifier thread is needed
+    listener = OnCan()
+    radar_recv = can_bus2.recv
+    on_radar_message = listener.on_message_received
+    periodic_tasks = []
 
     try:
-        acc_message = db.get_message_by_name("ACC_CONTROL")
-        frame = 0.0
+        # Resolve every message used below once; a missing name fails here,
+        # before any frame has been sent
+        messages = {
+            name: db.get_message_by_name(name)
+            for name in (
+                "SPEED",
+                "PCM_CRUISE",
+                "PCM_CRUISE_2",
+                "ACC_CONTROL",
+                "PCM_CRUISE_SM",
+            )
+        }
+        acc_message = messages["ACC_CONTROL"]
+        frame = 0
 
         # Send one-time initialization messages
-        msg = db.get_message_by_name("SPEED")
+        msg = messages["SPEED"]
         can_bus1.send(
             can.Message(
                 arbitration_id=msg.frame_id,
@@ -252,7 +346,7 @@ if __name__ == "__main__":
             )
         )
 
-        cruise_message = db.get_message_by_name("PCM_CRUISE")
+        cruise_message = messages["PCM_CRUISE"]
         active_message = cruise_message.encode(
             {
                 "CRUISE_STATE": 9,
@@ -269,7 +363,7 @@ if __name__ == "__main__":
         )
         can_bus1.send(msg)
 
-        msg = db.get_message_by_name("PCM_CRUISE_2")
+        msg = messages["PCM_CRUISE_2"]
         can_bus1.send(
             can.Message(
                 arbitration_id=msg.frame_id,
@@ -285,7 +379,7 @@ if __name__ == "__main__":
             )
         )
 
-        msg = db.get_message_by_name("ACC_CONTROL")
+        msg = acc_message
         can_bus1.send(
             can.Message(
                 arbitration_id=msg.frame_id,
@@ -303,7 +397,7 @@ if __name__ == "__main__":
             )
         )
 
-        msg = db.get_message_by_name("PCM_CRUISE_SM")
+        msg = messages["PCM_CRUISE_SM"]
         can_bus1.send(
             can.Message(
                 arbitration_id=msg.frame_id,
@@ -316,48 +410,101 @@ if __name__ == "__main__":
 
         print("Initialization messages sent. Entering main loop...\n")
 
+        # Static payloads never change, so build their Messages once.
+        # The 0x489/0x48A counter frames get a trailing byte patched in place
+        # (python-can keeps a bytearray passed as data without copying).
+        static_prepared = []
+        for addr, ecu, cars, bus, fr_step, vl in STATIC_MSGS:
+            can_bus = can_bus1 if bus == 0 else can_bus2
+            if addr in (0x489, 0x48A) and bus == 0:
+                # Counter runs 1..15, stepping once a second; 0x48A sets bit 7
+                counter_base = 1 << 7 if addr == 0x48A else 0
+                counters = bytes(counter_base + i + 1 for i in range(0xF))
+                data = bytearray(vl + b"\x00")
+            else:
+                counters = None
+                data = vl
+            message = can.Message(arbitration_id=addr, data=data, is_extended_id=False)
+            static_prepared.append((fr_step, can_bus, message, counters))
+
+        # ACC_CONTROL content is constant, so encode it once
+        acc_frame = can.Message(
+            arbitration_id=acc_message.frame_id,
+            data=acc_message.encode(
+                {
+                    "ACCEL_CMD": 0.0,
+                    "SET_ME_X63": 0x63,
+                    "SET_ME_1": 1,
+                    "RELEASE_STANDSTILL": 1,
+                    "CANCEL_REQ": 0,
+                    "CHECKSUM": 113,
+                }
+            ),
+            is_extended_id=False,
+        )
+
+        # Hand constant frames to python-can's cyclic sender, which on
+        # SocketCAN is the kernel broadcast manager (BCM). Anything it
+        # refuses, plus the counter frames, stays in the Python loop.
+        try:
+            periodic_tasks.append(can_bus1.send_periodic(acc_frame, 1.0 / 100))
+            acc_frame = None
+        except Exception as e:
+            print(f"Warning: send_periodic ACC_CONTROL failed: {e}")
+        loop_frames = []
+        for entry in static_prepared:
+            fr_step, can_bus, message, counters = entry
+            if counters is None:
+                try:
+                    periodic_tasks.append(can_bus.send_periodic(message, fr_step / 100))
+                    continue
+                except Exception as e:
+                    print(f"Warning: send_periodic 0x{message.arbitration_id:03X} failed: {e}")
+            loop_frames.append(entry)
+        print(f"✓ {len(periodic_tasks)} periodic frames handed to the kernel")
+
+        # The loop's schedule repeats every LCM(steps) ticks, so precompute
+        # which frames fire on each tick of that cycle
+        cycle = 1
+        for fr_step, *_rest in loop_frames:
+            cycle = cycle * fr_step // math.gcd(cycle, fr_step)
+        static_wheel = [[] for _ in range(cycle)]
+        for fr_step, can_bus, message, counters in loop_frames:
+            for tick in range(0, cycle, fr_step):
+                static_wheel[tick].append((can_bus, message, counters))
+
+        # Pace on absolute deadlines so late wake-ups do not accumulate drift
+        period_ns = 10_000_000  # 100 Hz
+        next_deadline = time.monotonic_ns()
+
         # Main loop - send periodic messages to keep radar alive
         while True:
-            # Send ACC control message every frame
-            if frame % 1 == 0:
-                acc_msg = acc_message.encode(
-                    {
-                        "ACCEL_CMD": 0.0,
-                        "SET_ME_X63": 0x63,
-                        "SET_ME_1": 1,
-                        "RELEASE_STANDSTILL": 1,
-                        "CANCEL_REQ": 0,
-                        "CHECKSUM": 113,
-                    }
-                )
-                msg = can.Message(
-                    arbitration_id=acc_message.frame_id,
-                    data=acc_msg,
-                    is_extended_id=False,
-                )
-                can_bus1.send(msg)
+            # Send ACC control message every frame unless the kernel does
+            if acc_frame is not None:
+                can_bus1.send(acc_frame)
 
             # Send static DSU messages at their specified intervals
-            for addr, ecu, cars, bus, fr_step, vl in STATIC_MSGS:
-                if frame % fr_step == 0:
-                    # Handle special counter logic for 0x489 and 0x48a
-                    tosend = bytearray(vl)
-                    if addr in (0x489, 0x48A) and bus == 0:
-                        cnt = int((frame / 100) % 0xF) + 1
-                        if addr == 0x48A:
-                            cnt += 1 << 7
-                        tosend.append(cnt)
-
-                    # Select correct bus
-                    can_bus = can_bus1 if bus == 0 else can_bus2
-
-                    message = can.Message(
-                        arbitration_id=addr, data=bytes(tosend), is_extended_id=False
-                    )
-                    can_bus.send(message)
-
-            frame += 1.0
-            time.sleep(1.0 / 100)  # 100 Hz update rate
+            for can_bus, message, counters in static_wheel[frame % cycle]:
+                # Handle special counter logic for 0x489 and 0x48a
+                if counters is not None:
+                    message.data[-1] = counters[(frame // 100) % 0xF]
+                can_bus.send(message)
+
+            frame += 1
+            next_deadline += period_ns
+            if next_deadline <= time.monotonic_ns():
+                # Overran a whole tick; resync rather than burst to catch up
+                next_deadline = time.monotonic_ns()
+
+            # Block on the radar bus until the next tick, handling frames as
+            # they arrive, then drain anything still queued
+            while True:
+                delay = next_deadline - time.monotonic_ns()
+                rx_msg = radar_recv(max(delay, 0) / 1e9)
+                if rx_msg is not None:
+                    on_radar_message(rx_msg)
+                elif delay <= 0:
+                    break
 
     except KeyboardInterrupt:
         print("\n\nStopping radar control...")
@@ -368,10 +515,11 @@ if __name__ == "__main__":
         traceback.print_exc()
     finally:
         print("\nCleaning up...")
-        try:
-            notifier.stop()
-        except:
-            pass
+        for task in periodic_tasks:
+            try:
+                task.stop()
+            except:
+                pass
         try:
             can_bus1.shutdown()
         except: